@@ -12,7 +12,7 @@ fi
 
 [ -d /opt ] || sudo mkdir -p /opt
 [ -d /usr/local/bin ] || sudo mkdir -p /usr/local/bin
-sudo pyinstaller --onedir src/relay/relay.py --clean --add-data "src/relay:relay" --hidden-import toml --hidden-import json --hidden-import platform
+sudo pyinstaller --onedir src/relay/relay.py --clean --add-data "src/relay:relay" --hidden-import tomli_w --hidden-import json --hidden-import platform
 
 if [ ! -d dist/relay ]; then
     echo "Build failed. dist/relay not found."
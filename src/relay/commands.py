@@ -1,25 +1,27 @@
+import os
 import sys
-import toml
-import platform
+import subprocess
+import logging
 from pathlib import Path
 
-try:
-    from utils import run_command
-    from constants import MANIFEST_FILE
-    from templates import MAIN_C_TEMPLATE, MAIN_H_TEMPLATE, CMAKELISTS_TEMPLATE, RELAY_TOML_TEMPLATE, CLANG_FORMAT_TEMPLATE, GITIGNORE
-    from helpers import find_project_root, find_vcpkg_root, get_vcpkg_triplet, get_build_dir, generate_vcpkg_json, generate_vcpkg_json_from_relay_toml, update_cmake_lists_txt
-    from colours import colored, GREEN, YELLOW, RED, CYAN, BOLD, RESET, BRIGHT_BLACK
-except ModuleNotFoundError:
+if __package__:
     from relay.utils import run_command
-    from relay.constants import MANIFEST_FILE
-    from relay.templates import MAIN_C_TEMPLATE, MAIN_H_TEMPLATE, CMAKELISTS_TEMPLATE, RELAY_TOML_TEMPLATE, CLANG_FORMAT_TEMPLATE, GITIGNORE
-    from relay.helpers import find_project_root, find_vcpkg_root, get_vcpkg_triplet, get_build_dir, generate_vcpkg_json, generate_vcpkg_json_from_relay_toml, update_cmake_lists_txt
+    from relay.constants import MANIFEST_FILE, BUILD_FINGERPRINT_FILE
+    from relay.helpers import load_manifest, invalidate_manifest, write_atomic, find_project_root, find_vcpkg_root, find_vcpkg_toolchain_file, get_vcpkg_triplet, get_build_dir, get_build_stamp_path, sources_newer_than, generate_vcpkg_json, generate_vcpkg_json_from_relay_toml, update_cmake_lists_txt
     from relay.colours import colored, GREEN, YELLOW, RED, CYAN, BOLD, RESET, BRIGHT_BLACK
-except Exception:
-    pass
+else:
+    from utils import run_command
+    from constants import MANIFEST_FILE, BUILD_FINGERPRINT_FILE
+    from helpers import load_manifest, invalidate_manifest, write_atomic, find_project_root, find_vcpkg_root, find_vcpkg_toolchain_file, get_vcpkg_triplet, get_build_dir, get_build_stamp_path, sources_newer_than, generate_vcpkg_json, generate_vcpkg_json_from_relay_toml, update_cmake_lists_txt
+    from colours import colored, GREEN, YELLOW, RED, CYAN, BOLD, RESET, BRIGHT_BLACK
+
+log = logging.getLogger(__name__)
+
+_IS_WINDOWS = sys.platform.startswith("win")
+_EXE_SUFFIX = ".exe" if _IS_WINDOWS else ""
+_LIST_HEADER = colored("\nListing Project Dependencies...", CYAN) + "\n" + colored("================================", CYAN) + "\n"
 
 def run_new(args):
-    verbose = args.verbose
     project_name = args.project_name
     project_path = Path(project_name)
 
@@ -28,42 +30,41 @@ def run_new(args):
         sys.exit(1)
     print(colored(f"Creating binary (application) `{project_name}` package...", CYAN))
 
+    if __package__:
+        from relay.templates import render_new_project
+    else:
+        from templates import render_new_project
+
+    files = render_new_project(project_name)
+
     try:
-        project_path.mkdir()
-        (project_path / "src").mkdir()
-        (project_path / "include").mkdir()
-
-        main_c_content = MAIN_C_TEMPLATE.format(project_name=project_name)
-        (project_path / "src" / "main.c").write_text(main_c_content)
-        verbose and print(colored("Created src/main.c", GREEN))
-
-        include_guard = f"{project_name.upper().replace('-', '_').replace('.', '_')}_H"
-        main_h_content = MAIN_H_TEMPLATE.format(include_guard=include_guard)
-        (project_path / "include" / f"{project_name}.h").write_text(main_h_content)
-        verbose and print(colored(f"Created include/{project_name}.h", GREEN))
-
-        cmakelist_content = CMAKELISTS_TEMPLATE.format(project_name=project_name)
-        (project_path / "CmakeLists.txt").write_text(cmakelist_content)
-        verbose and print(colored("Created CmakeLists.txt", GREEN))
-
-        (project_path / ".clang-format").write_text(CLANG_FORMAT_TEMPLATE)
-        verbose and print(colored("Created .clang-format", GREEN))
-
-        (project_path / ".gitignore").write_text(GITIGNORE)
-        git_init_command = ["git", "init", str(project_path)]
-        run_command(git_init_command, verbose=verbose)
-        verbose and print(colored("Created .gitignore", GREEN))
-
-        relay_toml_content = RELAY_TOML_TEMPLATE.format(project_name=project_name)
-        (project_path / MANIFEST_FILE).write_text(relay_toml_content)
-        verbose and print(colored(f"Created {MANIFEST_FILE}", GREEN))
-
-        print(colored(f"\nSuccessfully created project '{project_name}'.", GREEN))
-        print(f"{CYAN}Next steps:{RESET}")
-        print(f"  {CYAN}cd {project_name}{RESET}")
-        print(f"  {CYAN}relay add <dependency>{RESET}")
-        print(f"  {CYAN}relay install{RESET}")
-        print(f"  {CYAN}relay build{RESET}")
+        for directory in sorted({os.path.dirname(relative_path) for relative_path, _ in files} - {""}):
+            os.makedirs(project_path / directory)
+
+        # Let git init run while the files are written.
+        git_init_command = ["git", "init", str(project_path)] if args.verbose else ["git", "init", "-q", str(project_path)]
+        log.debug("\nRunning command: %s", " ".join(git_init_command))
+        try:
+            git_proc = subprocess.Popen(git_init_command, stdout=None if args.verbose else subprocess.DEVNULL)
+        except FileNotFoundError:
+            print(colored("Warning: 'git' not found in PATH. Skipping repository initialisation.", YELLOW), file=sys.stderr)
+            git_proc = None
+
+        for relative_path, content in files:
+            (project_path / relative_path).write_bytes(content.encode("utf-8"))
+            log.debug("Created %s", relative_path)
+
+        if git_proc is not None and git_proc.wait() != 0:
+            print(colored(f"Warning: 'git init' exited with code {git_proc.returncode}.", YELLOW), file=sys.stderr)
+
+        sys.stdout.write(
+            f"{GREEN}\nSuccessfully created project '{project_name}'.{RESET}\n"
+            f"{CYAN}Next steps:{RESET}\n"
+            f"  {CYAN}cd {project_name}{RESET}\n"
+            f"  {CYAN}relay add <dependency>{RESET}\n"
+            f"  {CYAN}relay install{RESET}\n"
+            f"  {CYAN}relay build{RESET}\n"
+        )
 
     except OSError as e:
         print(colored(f"Error creating project directories or files: {e}", RED), file=sys.stderr)
@@ -72,117 +73,195 @@ def run_new(args):
         print(colored(f"An unexpected error occurred: {e}", RED), file=sys.stderr)
         sys.exit(1)
 
+def _build_jobs():
+    # RELAY_JOBS caps the job count, e.g. on machines short on memory.
+    jobs = os.environ.get("RELAY_JOBS")
+    if jobs:
+        try:
+            count = int(jobs)
+        except ValueError:
+            count = 0
+        if count > 0:
+            return count
+        print(colored(f"Warning: Ignoring RELAY_JOBS={jobs!r}; expected a positive integer.", YELLOW), file=sys.stderr)
+    return os.cpu_count() or 1
+
 def run_build(args):
+    import json
+    import shutil
+    import hashlib
     verbose = args.verbose
 
     print(colored("Building project...", CYAN))
-    project_root = find_project_root(verbose)
-    vcpkg_root = find_vcpkg_root(verbose)
-
-    vcpkg_toolchain_file = vcpkg_root / "scripts" / "buildsystems" / "vcpkg.cmake"
-    if not vcpkg_toolchain_file.exists():
-         vcpkg_toolchain_file = vcpkg_root / "share" / "vcpkg" / "vcpkg.cmake"
-         if not vcpkg_toolchain_file.exists():
-            print(colored(f"Error: vcpkg toolchain file not found at expected locations relative to VCPKG_ROOT: {vcpkg_root}", RED), file=sys.stderr)
-            print(colored("Looked for:", RED),
-                  colored(vcpkg_root / "scripts" / "buildsystems" / "vcpkg.cmake", RED), "and",
-                  colored(vcpkg_root / "share" / "vcpkg" / "vcpkg.cmake", RED), file=sys.stderr)
-            print(colored("Please ensure VCPKG_ROOT is set correctly and vcpkg is installed properly (usually requires cloning the Git repository).", RED), file=sys.stderr)
-            sys.exit(1)
+    project_root = find_project_root()
+    vcpkg_root = find_vcpkg_root()
+
+    vcpkg_toolchain_file = find_vcpkg_toolchain_file(vcpkg_root)
+    if vcpkg_toolchain_file is None:
+        print(colored(f"Error: vcpkg toolchain file not found at expected locations relative to VCPKG_ROOT: {vcpkg_root}", RED), file=sys.stderr)
+        print(colored("Looked for:", RED),
+              colored(vcpkg_root / "scripts" / "buildsystems" / "vcpkg.cmake", RED), "and",
+              colored(vcpkg_root / "share" / "vcpkg" / "vcpkg.cmake", RED), file=sys.stderr)
+        print(colored("Please ensure VCPKG_ROOT is set correctly and vcpkg is installed properly (usually requires cloning the Git repository).", RED), file=sys.stderr)
+        sys.exit(1)
 
-    triplet = get_vcpkg_triplet(args.toolchain, verbose)
-    verbose and print(colored(f"Using vcpkg triplet: {triplet}", CYAN))
+    triplet = get_vcpkg_triplet(args.toolchain)
+    log.debug("Using vcpkg triplet: %s", triplet)
 
     build_dir = get_build_dir(project_root, triplet)
-    verbose and print(colored(f"Build directory: {build_dir}", CYAN))
+    log.debug("Build directory: %s", build_dir)
 
-    generate_vcpkg_json(project_root, build_dir, verbose)
+    generate_vcpkg_json(project_root, build_dir)
 
-    verbose and print(colored("\n--- Configuring CMake ---", CYAN))
+    build_dir_str = os.fspath(build_dir)
     cmake_configure_command = [
         "cmake",
-        str(project_root),
-        "-B", str(build_dir),
+        os.fspath(project_root),
+        "-B", build_dir_str,
         f"-DCMAKE_TOOLCHAIN_FILE={vcpkg_toolchain_file}",
         f"-DVCPKG_TARGET_TRIPLET={triplet}",
+        # CMake caches this, so always pass it explicitly.
+        f"-DCMAKE_RULE_MESSAGES={'ON' if verbose else 'OFF'}",
     ]
-    if not run_command(cmake_configure_command, verbose=verbose):
-        print(colored("\nCMake configuration failed.", RED), file=sys.stderr)
-        sys.exit(1)
+    # Configure only a fresh build tree or changed arguments; the fingerprint marks the last successful run.
+    fingerprint = hashlib.sha256(json.dumps(cmake_configure_command).encode("utf-8")).hexdigest()
+    fingerprint_path = build_dir / BUILD_FINGERPRINT_FILE
+    has_cache = os.path.isfile(build_dir / "CMakeCache.txt")
+    try:
+        configured = has_cache and fingerprint_path.read_text() == fingerprint
+    except OSError:
+        configured = False
 
-    verbose and print(colored("\n--- Building Project ---", CYAN))
+    if configured:
+        log.debug("CMake configuration is up to date, skipping configure step.")
+    else:
+        if not has_cache and "CMAKE_GENERATOR" not in os.environ and shutil.which("ninja"):
+            cmake_configure_command += ["-G", "Ninja"]
+        log.debug("\n--- Configuring CMake ---")
+        try:
+            fingerprint_path.unlink()
+        except OSError:
+            pass
+        if not run_command(cmake_configure_command, verbose=verbose):
+            print(colored("\nCMake configuration failed.", RED), file=sys.stderr)
+            sys.exit(1)
+        fingerprint_path.write_text(fingerprint)
+
+    log.debug("\n--- Building Project ---")
     cmake_build_command = [
         "cmake",
-        "--build", str(build_dir),
+        "--build", build_dir_str,
+        "--parallel", str(_build_jobs()),
     ]
     if not run_command(cmake_build_command, verbose=verbose):
         print(colored("\nProject build failed.", RED), file=sys.stderr)
         sys.exit(1)
     print(colored("Build successful!", GREEN))
+    # Lets `relay run` find this build without guessing the triplet.
+    try:
+        get_build_stamp_path(project_root).write_text(triplet)
+    except OSError:
+        pass
 
 def run_run(args):
     verbose = args.verbose
-    verbose and print(colored("Running project...", CYAN))
+    log.debug("Running project...")
 
-    project_root = find_project_root(verbose)
+    project_root = find_project_root()
 
     if not project_root:
         # If find_project_root fails, it sys.exit(1) so this branch won't be hit usually
         print(colored("Error: Could not determine project root.", RED), file=sys.stderr)
         sys.exit(1)
 
-    triplet = get_vcpkg_triplet(args.toolchain, verbose)
+    if not args.toolchain and not os.environ.get("VCPKG_DEFAULT_TRIPLET"):
+        # Nothing pins the triplet, so run whatever the last build produced.
+        try:
+            args.toolchain = get_build_stamp_path(project_root).read_text().strip() or None
+        except OSError:
+            pass
+    triplet = get_vcpkg_triplet(args.toolchain)
     build_dir = get_build_dir(project_root, triplet)
     relay_toml_path = project_root / MANIFEST_FILE
 
     try:
-        with open(relay_toml_path, 'r') as f:
-            relay_config = toml.load(f)
+        relay_config = load_manifest(relay_toml_path)
         project_name = relay_config.get("project", {}).get("name", project_root.name)
         executable_name = relay_config.get("project", {}).get("main_executable", project_name)
     except FileNotFoundError:
         print(colored(f"Error: Manifest file '{relay_toml_path}' not found.", RED), file=sys.stderr)
         sys.exit(1)
-    except toml.TomlDecodeError as e:
+    except ValueError as e:
         print(colored(f"Error: Could not parse '{relay_toml_path}': {e}", RED), file=sys.stderr)
         sys.exit(1)
     except Exception as e:
          print(colored(f"An unexpected error occurred while reading project name from {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
          sys.exit(1)
 
-    exe_extension = ".exe" if platform.system() == "Windows" else ""
-    executable_path = build_dir / f"{executable_name}{exe_extension}"
+    executable_path = build_dir / f"{executable_name}{_EXE_SUFFIX}"
+
+    build_inputs = [
+        project_root / "src",
+        project_root / "include",
+        project_root / "CMakeLists.txt",
+        relay_toml_path,
+    ]
+    if os.path.isfile(executable_path) and not sources_newer_than(executable_path, build_inputs):
+        log.debug("%s is up to date, skipping build.", executable_path)
+    else:
+        run_build(args)
 
-    if not executable_path.exists():
+    if not os.path.isfile(executable_path):
         print(colored(f"Error: Executable not found at expected path: {executable_path}", RED), file=sys.stderr)
         print(colored("Please ensure the project built successfully and check your CMakeLists.txt for the executable target name.", YELLOW), file=sys.stderr)
         sys.exit(1)
 
-    if not run_command(command=[str(executable_path)], cwd=build_dir, verbose=verbose):
+    if _IS_WINDOWS:
+        if not run_command(command=[str(executable_path)], cwd=build_dir, verbose=verbose):
+            print(colored("\nProject run failed.", RED), file=sys.stderr)
+            sys.exit(1)
+        return
+
+    # Hand the process over to the program; its exit status passes straight through.
+    log.debug("\nRunning command: %s", executable_path)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        os.chdir(build_dir)
+        os.execv(executable_path, [str(executable_path)])
+    except OSError as e:
+        print(colored(f"Error: Could not execute '{executable_path}': {e}", RED), file=sys.stderr)
         print(colored("\nProject run failed.", RED), file=sys.stderr)
         sys.exit(1)
 
 def run_install_command(args):
-    verbose = args.verbose
     print(colored("\nStarting dependency installation process...", CYAN))
 
-    project_root = find_project_root(verbose)
+    project_root = find_project_root()
     if not project_root:
         print(colored("Error: Could not find project root. Are you in a Relay project?", RED), file=sys.stderr)
         return
 
-    if not generate_vcpkg_json_from_relay_toml(project_root):
+    relay_toml_path = project_root / MANIFEST_FILE
+    try:
+        relay_config = load_manifest(relay_toml_path)
+    except (FileNotFoundError, ValueError) as e:
+        print(colored(f"Error reading {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
+        print(colored("Installation aborted: Failed to generate vcpkg.json.", RED), file=sys.stderr)
+        return
+
+    if not generate_vcpkg_json_from_relay_toml(project_root, relay_config):
         print(colored("Installation aborted: Failed to generate vcpkg.json.", RED), file=sys.stderr)
         return
 
-    vcpkg_root = find_vcpkg_root(verbose)
+    vcpkg_root = find_vcpkg_root()
     if not vcpkg_root:
         print(colored("Error: Could not find VCPKG_ROOT environment variable or vcpkg executable.", RED), file=sys.stderr)
         print(colored("Please ensure vcpkg is installed and VCPKG_ROOT is set correctly, or it's in your system's PATH.", YELLOW), file=sys.stderr)
         return
 
     vcpkg_executable = vcpkg_root / "vcpkg"
-    if platform.system() == "Windows":
+    if _IS_WINDOWS:
         vcpkg_executable = vcpkg_root / "vcpkg.exe"
 
     if not vcpkg_executable.is_file():
@@ -201,7 +280,7 @@ def run_install_command(args):
     if result: # run_command returns True on success, False on failure.
         print(colored("\nDependencies installed successfully via vcpkg.", GREEN))
         print(colored("Attempting to update CMakeLists.txt automatically...", CYAN))
-        if update_cmake_lists_txt(project_root):
+        if update_cmake_lists_txt(project_root, relay_config):
             print(colored("CMakeLists.txt updated successfully.", GREEN))
         else:
             print(colored("Failed to automatically update CMakeLists.txt. Please check for errors.", YELLOW), file=sys.stderr)
@@ -212,102 +291,96 @@ def run_install_command(args):
     print(colored("\nDependency installation process complete.", GREEN))
 
 def add_dependency_to_manifest(args):
-    verbose = args.verbose
+    import tomli_w
     dependency_name = args.dependency_name
     print(colored(f"\nAdding dependency '{BOLD}{dependency_name}{RESET}{CYAN}' to {MANIFEST_FILE}...", CYAN))
 
-    project_root = find_project_root(verbose)
+    project_root = find_project_root()
     if not project_root:
         print(colored("Error: Could not find project root. Are you in a Relay project (missing Relay.toml or vcpkg.json)?", RED), file=sys.stderr)
         return
 
     relay_toml_path = project_root / MANIFEST_FILE
 
-    if not relay_toml_path.exists():
+    if not os.path.isfile(relay_toml_path):
         print(colored(f"Warning: {MANIFEST_FILE} not found. Creating a minimal one.", YELLOW))
+        relay_config = {"project": {"name": project_root.name, "version": "0.1.0", "type": "executable"}}
+    else:
         try:
-            with open(relay_toml_path, 'w') as f:
-                toml.dump({"project": {"name": project_root.name, "version": "0.1.0", "type": "executable"}}, f)
-        except IOError as e:
-            print(colored(f"Error creating {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
+            relay_config = load_manifest(relay_toml_path)
+        except (FileNotFoundError, ValueError) as e:
+            print(colored(f"Error reading {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
             return
 
-    relay_config = {}
-    try:
-        with open(relay_toml_path, 'r') as f:
-            relay_config = toml.load(f)
-    except (FileNotFoundError, toml.TomlDecodeError) as e:
-        print(colored(f"Error reading {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
-        return
-
     if "dependencies" not in relay_config:
         relay_config["dependencies"] = {}
 
     if dependency_name in relay_config["dependencies"]:
-        print(colored(f"Dependency '{dependency_name}' already exists in {MANIFEST_FILE}.", YELLOW))
-    else:
-        relay_config["dependencies"][dependency_name] = "*"
-        print(colored(f"Added '{dependency_name}' to {MANIFEST_FILE}.", GREEN))
+        print(colored(f"Dependency '{dependency_name}' already exists in {MANIFEST_FILE}. Nothing to add.", YELLOW))
+        return
+
+    relay_config["dependencies"][dependency_name] = "*"
+    relay_config["dependencies"] = dict(sorted(relay_config["dependencies"].items()))
+    print(colored(f"Added '{dependency_name}' to {MANIFEST_FILE}.", GREEN))
 
+    invalidate_manifest(relay_toml_path)
     try:
-        with open(relay_toml_path, 'w') as f:
-            toml.dump(relay_config, f)
+        write_atomic(relay_toml_path, tomli_w.dumps(relay_config))
         print(colored(f"Successfully updated {MANIFEST_FILE}.", GREEN))
     except IOError as e:
         print(colored(f"Error writing to {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
         return
 
-    if not generate_vcpkg_json_from_relay_toml(project_root):
+    if not generate_vcpkg_json_from_relay_toml(project_root, relay_config):
         print(colored("Error: Failed to generate vcpkg.json after updating Relay.toml.", RED), file=sys.stderr)
         return
     print(colored(f"\nUse 'relay install' to download and build the dependencies.", CYAN))
 
 def run_remove_dependency(args):
+    import tomli_w
     dependency_name = args.dependency_name
-    verbose = args.verbose
-    verbose and print(colored(f"\nAttempting to remove dependency: '{BOLD}{dependency_name}{RESET}{CYAN}'...", CYAN))
+    log.debug("\nAttempting to remove dependency: '%s'...", dependency_name)
 
-    project_root = find_project_root(verbose)
+    project_root = find_project_root()
     if not project_root:
         print(colored("Error: Could not find project root. Are you in a Relay project?", RED), file=sys.stderr)
         return
 
     relay_toml_path = project_root / MANIFEST_FILE
-    if not relay_toml_path.exists():
+    if not os.path.isfile(relay_toml_path):
         print(colored(f"Error: {MANIFEST_FILE} not found at {relay_toml_path}. Cannot remove dependency.", RED), file=sys.stderr)
         return
 
     relay_config = {}
     try:
-        with open(relay_toml_path, 'r') as f:
-            relay_config = toml.load(f)
-    except (FileNotFoundError, toml.TomlDecodeError) as e:
+        relay_config = load_manifest(relay_toml_path)
+    except (FileNotFoundError, ValueError) as e:
         print(colored(f"Error reading {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
         return
 
     dependencies = relay_config.get("dependencies", {})
     if dependency_name in dependencies:
         del dependencies[dependency_name]
-        relay_config["dependencies"] = dependencies
+        relay_config["dependencies"] = dict(sorted(dependencies.items()))
         print(colored(f"Removed '{dependency_name}' from {MANIFEST_FILE}.", GREEN))
     else:
         print(colored(f"Dependency '{dependency_name}' not found in {MANIFEST_FILE}. Nothing to remove.", YELLOW))
         return
 
+    invalidate_manifest(relay_toml_path)
     try:
-        with open(relay_toml_path, 'w') as f:
-            toml.dump(relay_config, f)
+        write_atomic(relay_toml_path, tomli_w.dumps(relay_config))
         print(colored(f"Successfully updated {MANIFEST_FILE}.", GREEN))
     except IOError as e:
         print(colored(f"Error writing to {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
         return
 
-    if not generate_vcpkg_json_from_relay_toml(project_root):
+    if not generate_vcpkg_json_from_relay_toml(project_root, relay_config):
         print(colored("Error: Failed to regenerate vcpkg.json after removing dependency.", RED), file=sys.stderr)
         return
 
     print(colored("Updating CMakeLists.txt to reflect dependency changes...", CYAN))
-    if update_cmake_lists_txt(project_root):
+    if update_cmake_lists_txt(project_root, relay_config):
         print(colored("CMakeLists.txt updated successfully.", GREEN))
     else:
         print(colored("Failed to automatically update CMakeLists.txt. Please check for errors.", YELLOW), file=sys.stderr)
@@ -318,25 +391,22 @@ def run_remove_dependency(args):
     print(colored(f"You might also want to run 'relay clean' before rebuilding.", CYAN))
 
 def run_list_dependencies(args):
-    verbose = args.verbose
-    print(colored("\nListing Project Dependencies...", CYAN))
-    print(colored("================================", CYAN))
+    sys.stdout.write(_LIST_HEADER)
 
-    project_root = find_project_root(verbose)
+    project_root = find_project_root()
     if not project_root:
         print(colored("Error: Could not determine project root.", RED), file=sys.stderr)
         return
 
     relay_toml_path = project_root / MANIFEST_FILE
 
-    if not relay_toml_path.exists():
+    if not os.path.isfile(relay_toml_path):
         print(colored(f"Error: {MANIFEST_FILE} not found at {relay_toml_path}. Is this a Relay project?", RED), file=sys.stderr)
         sys.exit(1)
 
     try:
-        with open(relay_toml_path, 'r') as f:
-            relay_config = toml.load(f)
-    except toml.TomlDecodeError as e:
+        relay_config = load_manifest(relay_toml_path)
+    except ValueError as e:
         print(colored(f"Error: Could not parse {MANIFEST_FILE} at {relay_toml_path}: {e}", RED), file=sys.stderr)
         sys.exit(1)
 
@@ -348,31 +418,30 @@ def run_list_dependencies(args):
         print(colored(f"Warning: 'dependencies' section in {MANIFEST_FILE} is not a valid dictionary.", YELLOW), file=sys.stderr)
         print(colored("Please check your Relay.toml format.", YELLOW), file=sys.stderr)
     else:
-        sorted_deps = sorted(dependencies.items())
-        for dep_name, dep_version in sorted_deps:
-            if dep_version == "*":
-                print(f"  {colored(dep_name, BOLD)} {colored('(any compatible version)', BRIGHT_BLACK)}")
-            else:
-                print(f"  {colored(dep_name, BOLD)} {colored(f'== {dep_version}', BRIGHT_BLACK)}")
+        lines = []
+        for dep_name in sorted(dependencies):
+            dep_version = dependencies[dep_name]
+            version_text = "(any compatible version)" if dep_version == "*" else f"== {dep_version}"
+            lines.append(f"  {colored(dep_name, BOLD)} {colored(version_text, BRIGHT_BLACK)}\n")
+        sys.stdout.write("".join(lines))
 
     print(colored("\nDependency listing complete.", GREEN))
 
 def run_clean(args):
-    verbose = args.verbose
     toolchain = args.toolchain
     print(colored("Cleaning build artifacts...", CYAN))
 
-    project_root = find_project_root(verbose)
+    project_root = find_project_root()
     if not project_root:
         print(colored("Error: Could not find project root.", RED), file=sys.stderr)
         return
 
-    triplet = get_vcpkg_triplet(toolchain, verbose)
+    triplet = get_vcpkg_triplet(toolchain)
     build_dir = get_build_dir(project_root, triplet=triplet)
     if build_dir.exists():
         print(colored(f"Removing build directory: {build_dir}", CYAN))
         import shutil
-        shutil.rmtree(Path(build_dir).parent)
+        shutil.rmtree(build_dir)
         print(colored("Build directory cleaned successfully.", GREEN))
     else:
         print(colored("No build directory found to clean.", YELLOW))
\ No newline at end of file
@@ -1,6 +1,8 @@
 RELAY_VERSION = "0.1.0"
 MANIFEST_FILE = "Relay.toml"
 VCPKG_MANIFEST_FILE = "vcpkg.json"
+BUILD_FINGERPRINT_FILE = ".relay_fingerprint"
+BUILD_STAMP_FILE = ".relay-stamp"
 
 CMAKE_FIND_START_MARKER = "# <RELAY_DEPENDENCIES_FIND_START>"
 CMAKE_FIND_END_MARKER = "# <RELAY_DEPENDENCIES_FIND_END>"
@@ -1,105 +1,207 @@
 import os
+import stat
 import sys
-import toml
-import json
-import platform
-import shutil
+import logging
+from functools import lru_cache
 from pathlib import Path
 
-try:
-    from constants import (
+if __package__:
+    from relay.constants import (
         MANIFEST_FILE, VCPKG_MANIFEST_FILE, CMAKE_DEPENDENCY_MAPPING,
         CMAKE_FIND_END_MARKER, CMAKE_FIND_START_MARKER,
-        CMAKE_LINK_END_MARKER, CMAKE_LINK_START_MARKER
+        CMAKE_LINK_END_MARKER, CMAKE_LINK_START_MARKER, BUILD_STAMP_FILE
     )
-    from colours import colored, GREEN, YELLOW, RED, CYAN
-except ModuleNotFoundError:
-    from relay.constants import (
+    from relay.colours import colored, GREEN, YELLOW, RED
+else:
+    from constants import (
         MANIFEST_FILE, VCPKG_MANIFEST_FILE, CMAKE_DEPENDENCY_MAPPING,
         CMAKE_FIND_END_MARKER, CMAKE_FIND_START_MARKER,
-        CMAKE_LINK_END_MARKER, CMAKE_LINK_START_MARKER
+        CMAKE_LINK_END_MARKER, CMAKE_LINK_START_MARKER, BUILD_STAMP_FILE
     )
-    from relay.colours import colored, GREEN, YELLOW, RED, CYAN
-except Exception:
-    pass
-
-
-def find_project_root(verbose):
-    current_dir = Path.cwd()
-    for parent in [current_dir] + list(current_dir.parents):
-        manifest_path = parent / MANIFEST_FILE
-        cmakelists_path = parent / "CMakeLists.txt"
-        if manifest_path.exists() and cmakelists_path.exists():
-            verbose and print(colored(f"Found project root: {parent}", CYAN))
+    from colours import colored, GREEN, YELLOW, RED
+
+log = logging.getLogger(__name__)
+
+_manifest_cache = {}
+
+
+def load_manifest(relay_toml_path):
+    # TOMLDecodeError subclasses ValueError, which is what callers catch.
+    try:
+        import tomllib
+    except ModuleNotFoundError:
+        import tomli as tomllib
+
+    with open(relay_toml_path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        key = (st.st_mtime_ns, st.st_size)
+        cached = _manifest_cache.get(relay_toml_path)
+        if cached and cached[0] == key:
+            return cached[1]
+        data = f.read()
+    relay_config = tomllib.loads(data.decode("utf-8"))
+    _manifest_cache[relay_toml_path] = (key, relay_config)
+    return relay_config
+
+# Callers that mutate a loaded manifest must drop it before writing it back.
+def invalidate_manifest(relay_toml_path):
+    _manifest_cache.pop(relay_toml_path, None)
+
+def read_text(path):
+    # The counterpart of write_atomic: same encoding, line endings kept as-is.
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read()
+
+def write_atomic(path, content):
+    # Write next to the target and rename over it, so an interrupted write
+    # never leaves a truncated manifest or CMakeLists.txt behind. A symlinked
+    # target is followed, and the replacement keeps the original's mode.
+    path = Path(os.path.realpath(path))
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        tmp_path.write_bytes(content.encode("utf-8"))
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+# The lookups below are cached on everything they read (cwd, environment).
+def find_project_root():
+    return _find_project_root(Path.cwd())
+
+@lru_cache(maxsize=None)
+def _find_project_root(current_dir):
+    parent = current_dir
+    while True:
+        if os.path.isfile(parent / MANIFEST_FILE) and os.path.isfile(parent / "CMakeLists.txt"):
+            log.debug("Found project root: %s", parent)
             return parent
+        if parent.parent == parent:
+            break
+        parent = parent.parent
     print(colored(f"Error: Could not find project root. '{MANIFEST_FILE}' and 'CMakeLists.txt' not found in current directory or any parent directory.", RED), file=sys.stderr)
     sys.exit(1)
 
-def find_vcpkg_root(verbose):
-    vcpkg_root = os.environ.get("VCPKG_ROOT")
+def find_vcpkg_root():
+    return _find_vcpkg_root(os.environ.get("VCPKG_ROOT"), os.environ.get("PATH"))
+
+@lru_cache(maxsize=None)
+def _find_vcpkg_root(vcpkg_root, search_path):
     if vcpkg_root:
         vcpkg_root_path = Path(vcpkg_root)
-        toolchain_file_standard = vcpkg_root_path / "scripts" / "buildsystems" / "vcpkg.cmake"
-        if toolchain_file_standard.exists():
-            verbose and print(colored(f"Found VCPKG_ROOT from environment variable (standard layout): {vcpkg_root_path}", CYAN))
-            return vcpkg_root_path
-        toolchain_file_homebrew = vcpkg_root_path / "share" / "vcpkg" / "vcpkg.cmake"
-        if toolchain_file_homebrew.exists():
-            verbose and print(colored(f"Found VCPKG_ROOT from environment variable (Homebrew layout): {vcpkg_root_path}", CYAN))
+        if find_vcpkg_toolchain_file(vcpkg_root_path):
+            log.debug("Found VCPKG_ROOT from environment variable: %s", vcpkg_root_path)
             return vcpkg_root_path
         print(colored(f"Warning: VCPKG_ROOT environment variable is set to '{vcpkg_root}', but a valid vcpkg.cmake was not found in expected locations.", YELLOW), file=sys.stderr)
     
-    vcpkg_executable_path = shutil.which("vcpkg")
+    import shutil
+    vcpkg_executable_path = shutil.which("vcpkg", path=search_path)
     if vcpkg_executable_path:
-        verbose and print(colored(f"Found vcpkg executable in PATH: {vcpkg_executable_path}", CYAN))
+        log.debug("Found vcpkg executable in PATH: %s", vcpkg_executable_path)
         return Path(vcpkg_executable_path).parent
 
     print(colored("Error: VCPKG_ROOT environment variable not set or invalid, and 'vcpkg' not found in PATH.", RED), file=sys.stderr)
     print(colored("Please set the VCPKG_ROOT environment variable to your vcpkg installation path (usually the Git clone directory) or ensure 'vcpkg' is in your system's PATH.", YELLOW), file=sys.stderr)
     sys.exit(1)
 
-def get_vcpkg_triplet(toolchain_arg, verbose):
+# Where vcpkg.cmake lives relative to the vcpkg root: the standard Git clone
+# layout first, then the Homebrew one.
+_VCPKG_TOOLCHAIN_CANDIDATES = (
+    ("scripts", "buildsystems", "vcpkg.cmake"),
+    ("share", "vcpkg", "vcpkg.cmake"),
+)
+
+@lru_cache(maxsize=None)
+def find_vcpkg_toolchain_file(vcpkg_root):
+    candidates = (vcpkg_root.joinpath(*parts) for parts in _VCPKG_TOOLCHAIN_CANDIDATES)
+    return next((candidate for candidate in candidates if os.path.isfile(candidate)), None)
+
+# (platform.system(), platform.machine()) -> vcpkg triplet, with a per-system
+# pattern for machines not listed.
+_KNOWN_TRIPLETS = {
+    ("Windows", "AMD64"): "x64-windows",
+    ("Windows", "x86_64"): "x64-windows",
+    ("Windows", "ARM64"): "arm64-windows",
+    ("Linux", "x86_64"): "x64-linux",
+    ("Linux", "aarch64"): "arm64-linux",
+    ("Darwin", "x86_64"): "x64-osx",
+}
+_FALLBACK_TRIPLETS = {
+    "Windows": "x86-windows",
+    "Linux": "{machine}-linux",
+    "Darwin": "{machine}-osx",
+}
+
+def get_vcpkg_triplet(toolchain_arg):
+    return _get_vcpkg_triplet(toolchain_arg, os.environ.get("VCPKG_DEFAULT_TRIPLET"))
+
+@lru_cache(maxsize=None)
+def _get_vcpkg_triplet(toolchain_arg, default_triplet):
     if toolchain_arg:
         return toolchain_arg.lower()
     else:
-        default_triplet = os.environ.get("VCPKG_DEFAULT_TRIPLET")
         if default_triplet:
-            verbose and print(colored(f"Using VCPKG_DEFAULT_TRIPLET environment variable: {default_triplet}", CYAN))
+            log.debug("Using VCPKG_DEFAULT_TRIPLET environment variable: %s", default_triplet)
             return default_triplet.lower()
     
     print(colored("Warning: No --toolchain specified and VCPKG_DEFAULT_TRIPLET is not set.", YELLOW), file=sys.stderr)
+    import platform
     system = platform.system()
     machine = platform.machine()
 
-    guessed_triplet = None
-    if system == "Windows":
-        guessed_triplet = "x64-windows" if machine in ('AMD64', 'x86_64') else "x86-windows"
-    elif system == "Linux":
-        guessed_triplet = "x64-linux" if machine in ('x86_64',) else f"{machine}-linux"
-    elif system == "Darwin":
-        guessed_triplet = "x64-osx" if machine in ('x86_64',) else f"{machine}-osx"
-    else:
+    guessed_triplet = _KNOWN_TRIPLETS.get((system, machine))
+    if guessed_triplet is None and system in _FALLBACK_TRIPLETS:
+        guessed_triplet = _FALLBACK_TRIPLETS[system].format(machine=machine)
+    if guessed_triplet is None:
         print(colored(f"Error: Cannot guess default triplet for unknown system '{system}'. Please specify --toolchain or set VCPKG_DEFAULT_TRIPLET.", RED), file=sys.stderr)
         sys.exit(1)
-    verbose and print(colored(f"Guessing default triplet based on OS/architecture: {guessed_triplet}. Consider setting VCPKG_DEFAULT_TRIPLET or using --toolchain.", YELLOW), file=sys.stderr)
+    log.debug("Guessing default triplet based on OS/architecture: %s. Consider setting VCPKG_DEFAULT_TRIPLET or using --toolchain.", guessed_triplet)
     return guessed_triplet
 
+def _modified_after(path, mtime_ns):
+    try:
+        return path.stat().st_mtime_ns > mtime_ns
+    except OSError:
+        # Dangling symlinks such as editor lock files, or files removed mid-scan.
+        return False
+
+def sources_newer_than(target, sources):
+    target_mtime = target.stat().st_mtime_ns
+    for source in sources:
+        if not source.exists():
+            continue
+        # A directory's own mtime changes when files are added or removed.
+        paths = [source, *source.rglob("*")] if source.is_dir() else [source]
+        if any(_modified_after(path, target_mtime) for path in paths):
+            return True
+    return False
+
 def get_build_dir(project_root, triplet):
     sanitized_triplet = triplet.replace('-', '_')
     build_dir = project_root / "build" / sanitized_triplet
     return build_dir
 
-def generate_vcpkg_json(project_root, build_dir, verbose):
+def get_build_stamp_path(project_root):
+    return project_root / "build" / BUILD_STAMP_FILE
+
+def generate_vcpkg_json(project_root, build_dir):
+    import json
     relay_toml_path = project_root / MANIFEST_FILE
     vcpkg_json_path = project_root / VCPKG_MANIFEST_FILE
 
     try:
-        with open(relay_toml_path, 'r') as f:
-            relay_config = toml.load(f)
+        relay_config = load_manifest(relay_toml_path)
     except FileNotFoundError:
         print(colored(f"Error: Manifest file '{relay_toml_path}' not found.", RED), file=sys.stderr)
         sys.exit(1)
-    except toml.TomlDecodeError as e:
+    except ValueError as e:
         print(colored(f"Error: Could not parse '{relay_toml_path}': {e}", RED), file=sys.stderr)
         sys.exit(1)
     
@@ -121,10 +223,19 @@ def generate_vcpkg_json(project_root, build_dir, verbose):
                  print(colored(f"Warning: Features for dependency '{name}' in {MANIFEST_FILE} is not a list. Skipping features.", YELLOW), file=sys.stderr)
 
         vcpkg_config["dependencies"].append(dep_entry)
+    new_content = json.dumps(vcpkg_config, indent=2)
     try:
         build_dir.mkdir(parents=True, exist_ok=True)
-        vcpkg_json_path.write_text(json.dumps(vcpkg_config, indent=2))
-        verbose and print(colored(f"Generated {VCPKG_MANIFEST_FILE} at {vcpkg_json_path}", GREEN))
+        # Rewriting an identical file would still bump its mtime.
+        try:
+            unchanged = read_text(vcpkg_json_path) == new_content
+        except OSError:
+            unchanged = False
+        if unchanged:
+            log.debug("%s at %s is up to date", VCPKG_MANIFEST_FILE, vcpkg_json_path)
+        else:
+            write_atomic(vcpkg_json_path, new_content)
+            log.debug("Generated %s at %s", VCPKG_MANIFEST_FILE, vcpkg_json_path)
     except OSError as e:
         print(colored(f"Error writing {VCPKG_MANIFEST_FILE} to '{vcpkg_json_path}': {e}", RED), file=sys.stderr)
         sys.exit(1)
@@ -132,20 +243,21 @@ def generate_vcpkg_json(project_root, build_dir, verbose):
          print(colored(f"An unexpected error occurred during {VCPKG_MANIFEST_FILE} generation: {e}", RED), file=sys.stderr)
          sys.exit(1)
 
-def generate_vcpkg_json_from_relay_toml(project_root: Path):
+def generate_vcpkg_json_from_relay_toml(project_root: Path, relay_config=None):
+    import json
     relay_toml_path = project_root / MANIFEST_FILE
     vcpkg_json_path = project_root / VCPKG_MANIFEST_FILE
 
-    if not relay_toml_path.exists():
-        print(colored(f"Error: {MANIFEST_FILE} not found at {relay_toml_path}.", RED), file=sys.stderr)
-        return False
+    if relay_config is None:
+        if not relay_toml_path.exists():
+            print(colored(f"Error: {MANIFEST_FILE} not found at {relay_toml_path}.", RED), file=sys.stderr)
+            return False
 
-    try:
-        with open(relay_toml_path, 'r') as f:
-            relay_config = toml.load(f)
-    except (FileNotFoundError, toml.TomlDecodeError) as e:
-        print(colored(f"Error reading {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
-        return False
+        try:
+            relay_config = load_manifest(relay_toml_path)
+        except (FileNotFoundError, ValueError) as e:
+            print(colored(f"Error reading {MANIFEST_FILE}: {e}", RED), file=sys.stderr)
+            return False
     
     dependencies = relay_config.get("dependencies", {})
     vcpkg_dependencies_list = []
@@ -156,10 +268,11 @@ def generate_vcpkg_json_from_relay_toml(project_root: Path):
         "dependencies": sorted(vcpkg_dependencies_list)
     }
     
+    existing_content = None
     if vcpkg_json_path.exists():
         try:
-            with open(vcpkg_json_path, 'r') as f:
-                existing_vcpkg_config = json.load(f)
+            existing_content = read_text(vcpkg_json_path)
+            existing_vcpkg_config = json.loads(existing_content)
             if "builtin-baseline" in existing_vcpkg_config:
                 vcpkg_json_content["builtin-baseline"] = existing_vcpkg_config["builtin-baseline"]
             if "name" in existing_vcpkg_config:
@@ -168,32 +281,48 @@ def generate_vcpkg_json_from_relay_toml(project_root: Path):
             print(colored(f"Warning: Existing {VCPKG_MANIFEST_FILE} is malformed. Creating new one.", YELLOW))
         except Exception as e:
             print(colored(f"Warning: Could not read existing {VCPKG_MANIFEST_FILE} for baseline: {e}", YELLOW))
+
+    new_content = json.dumps(vcpkg_json_content, indent=4)
+    if new_content == existing_content:
+        print(colored(f"{VCPKG_MANIFEST_FILE} is already up to date with {MANIFEST_FILE}.", GREEN))
+        return True
     try:
-        with open(vcpkg_json_path, 'w') as f:
-            json.dump(vcpkg_json_content, f, indent=4)
+        write_atomic(vcpkg_json_path, new_content)
         print(colored(f"Generated/Updated {VCPKG_MANIFEST_FILE} based on {MANIFEST_FILE}.", GREEN))
         return True
     except IOError as e:
         print(colored(f"Error writing to {VCPKG_MANIFEST_FILE}: {e}", RED), file=sys.stderr)
         return False
 
-def update_cmake_lists_txt(project_root: Path):
+def _replace_marker_block(text, start_marker, end_marker, block):
+    start = text.find(start_marker)
+    if start == -1:
+        return text, False
+    body_start = text.find("\n", start) + 1
+    end = text.find(end_marker, body_start) if body_start else -1
+    if end == -1:
+        return text, False
+    body_end = text.rfind("\n", body_start - 1, end) + 1
+    return text[:body_start] + block + text[body_end:], True
+
+def update_cmake_lists_txt(project_root: Path, relay_config=None):
     cmake_lists_path = project_root / "CMakeLists.txt"
     relay_toml_path = project_root / MANIFEST_FILE
 
     if not cmake_lists_path.exists():
         print(colored(f"Error: CMakeLists.txt not found at {cmake_lists_path}. Cannot update.", RED), file=sys.stderr)
         return False
-    if not relay_toml_path.exists():
-        print(colored(f"Error: {MANIFEST_FILE} not found at {relay_toml_path}. Cannot update CMakeLists.txt.", RED), file=sys.stderr)
-        return False
 
-    try:
-        with open(relay_toml_path, 'r') as f:
-            relay_config = toml.load(f)
-    except (FileNotFoundError, toml.TomlDecodeError) as e:
-        print(colored(f"Error reading {MANIFEST_FILE} for CMake update: {e}", RED), file=sys.stderr)
-        return False
+    if relay_config is None:
+        if not relay_toml_path.exists():
+            print(colored(f"Error: {MANIFEST_FILE} not found at {relay_toml_path}. Cannot update CMakeLists.txt.", RED), file=sys.stderr)
+            return False
+
+        try:
+            relay_config = load_manifest(relay_toml_path)
+        except (FileNotFoundError, ValueError) as e:
+            print(colored(f"Error reading {MANIFEST_FILE} for CMake update: {e}", RED), file=sys.stderr)
+            return False
     project_name = relay_config.get("project", {}).get("name")
     if not project_name:
         print(colored(f"Error: 'project.name' not found in {MANIFEST_FILE}. Cannot update CMakeLists.txt.", RED), file=sys.stderr)
@@ -201,68 +330,32 @@ def update_cmake_lists_txt(project_root: Path):
 
     dependencies = relay_config.get("dependencies", {})
 
-    find_package_lines = []
-    target_link_lines = []
-    for dep_name in dependencies.keys():
-        mapping = CMAKE_DEPENDENCY_MAPPING.get(dep_name)
-        if mapping:
-            find_package_lines.append(mapping["find_package"])
-            target_link_lines.append(mapping["target_link"])
-        else:
+    mappings = [CMAKE_DEPENDENCY_MAPPING[dep_name] for dep_name in dependencies if dep_name in CMAKE_DEPENDENCY_MAPPING]
+    for dep_name in dependencies:
+        if dep_name not in CMAKE_DEPENDENCY_MAPPING:
             print(colored(f"Warning: No CMake mapping found for dependency '{dep_name}'. Please add it to CMAKE_DEPENDENCY_MAPPING in constants.py if needed, or handle it manually in CMakeLists.txt.", YELLOW), file=sys.stderr)
 
-    find_package_lines.sort()
-    target_link_lines.sort()
+    # Several packages can map to the same find_package()/target.
+    find_package_lines = sorted({mapping["find_package"] for mapping in mappings})
+    target_link_lines = sorted({mapping["target_link"] for mapping in mappings})
 
+    find_block = "".join(f"  {fp_line}\n" for fp_line in find_package_lines)
     if target_link_lines:
-        combined_target_link_line = f"target_link_libraries({project_name} PRIVATE " + " ".join(target_link_lines) + ")"
+        link_block = f"  target_link_libraries({project_name} PRIVATE " + " ".join(target_link_lines) + ")\n"
     else:
-        combined_target_link_line = ""
+        link_block = ""
 
     try:
-        with open(cmake_lists_path, 'r') as f:
-            lines = f.readlines()
+        original = read_text(cmake_lists_path)
     except IOError as e:
         print(colored(f"Error reading CMakeLists.txt at {cmake_lists_path}: {e}", RED), file=sys.stderr)
         return False
+    if "\r\n" in original:
+        find_block = find_block.replace("\n", "\r\n")
+        link_block = link_block.replace("\n", "\r\n")
 
-    new_lines = []
-    in_find_section = False
-    in_link_section = False
-    find_marker_found = False
-    link_marker_found = False
-
-    for line in lines:
-        if CMAKE_FIND_START_MARKER in line:
-            find_marker_found = True
-            new_lines.append(line)
-            in_find_section = True
-            for fp_line in find_package_lines:
-                new_lines.append(f"  {fp_line}\n")
-            continue
-
-        if CMAKE_FIND_END_MARKER in line:
-            new_lines.append(line)
-            in_find_section = False
-            continue
-
-        if CMAKE_LINK_START_MARKER in line:
-            link_marker_found = True
-            new_lines.append(line)
-            in_link_section = True
-            if combined_target_link_line:
-                new_lines.append(f"  {combined_target_link_line}\n")
-            continue
-
-        if CMAKE_LINK_END_MARKER in line:
-            new_lines.append(line)
-            in_link_section = False
-            continue
-
-        if in_find_section or in_link_section:
-            continue
-
-        new_lines.append(line)
+    new_content, find_marker_found = _replace_marker_block(original, CMAKE_FIND_START_MARKER, CMAKE_FIND_END_MARKER, find_block)
+    new_content, link_marker_found = _replace_marker_block(new_content, CMAKE_LINK_START_MARKER, CMAKE_LINK_END_MARKER, link_block)
 
     if not find_marker_found:
         print(colored(f"Warning: {CMAKE_FIND_START_MARKER} and {CMAKE_FIND_END_MARKER} not found in CMakeLists.txt.", YELLOW))
@@ -271,9 +364,13 @@ def update_cmake_lists_txt(project_root: Path):
         print(colored(f"Warning: {CMAKE_LINK_START_MARKER} and {CMAKE_LINK_END_MARKER} not found in CMakeLists.txt.", YELLOW))
         print(colored("Please add these markers to your CMakeLists.txt for automatic dependency linking.", YELLOW))
 
+    # Touching an unchanged file would make the next build re-run configure.
+    if new_content == original:
+        log.debug("CMakeLists.txt is already up to date.")
+        return True
+
     try:
-        with open(cmake_lists_path, 'w') as f:
-            f.writelines(new_lines)
+        write_atomic(cmake_lists_path, new_content)
         print(colored(f"Successfully updated CMakeLists.txt at {cmake_lists_path}.", GREEN))
         return True
     except IOError as e:
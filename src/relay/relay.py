@@ -1,26 +1,58 @@
-import argparse
 import sys
+import functools
+from types import SimpleNamespace
 
-try:
+if __package__:
     from relay.constants import RELAY_VERSION
-    from relay.commands import (
-        run_new, run_build, run_run, run_clean,
-        run_install_command, run_list_dependencies,
-        run_remove_dependency, add_dependency_to_manifest
-    )
-    from relay.colours import colored, CYAN, BOLD, RED 
-except ModuleNotFoundError:
+    from relay.colours import colored, CYAN, BOLD, RED
+else:
     from constants import RELAY_VERSION
-    from commands import (
-        run_new, run_build, run_run, run_clean,
-        run_install_command, run_list_dependencies,
-        run_remove_dependency, add_dependency_to_manifest
-    )
     from colours import colored, CYAN, BOLD, RED
-except Exception:
-    pass
 
-def main():
+def _lazy(handler_name):
+    # Import the command implementations only when a subcommand actually runs.
+    def handler(args):
+        if __package__:
+            import relay.commands as commands
+        else:
+            import commands
+        return getattr(commands, handler_name)(args)
+    return handler
+
+# Bare `relay <command> [<name>]` calls: command -> (handler, positional or None).
+_FAST_PATH_COMMANDS = {
+    "new": ("run_new", "project_name"),
+    "build": ("run_build", None),
+    "b": ("run_build", None),
+    "run": ("run_run", None),
+    "r": ("run_run", None),
+    "install": ("run_install_command", None),
+    "i": ("run_install_command", None),
+    "add": ("add_dependency_to_manifest", "dependency_name"),
+    "remove": ("run_remove_dependency", "dependency_name"),
+    "rm": ("run_remove_dependency", "dependency_name"),
+    "list": ("run_list_dependencies", None),
+    "l": ("run_list_dependencies", None),
+    "clean": ("run_clean", None),
+}
+
+def _fast_path_args(argv):
+    if not argv or argv[0] not in _FAST_PATH_COMMANDS:
+        return None, None
+    handler_name, positional = _FAST_PATH_COMMANDS[argv[0]]
+    args = SimpleNamespace(command=argv[0], toolchain=None, verbose=False)
+    if positional is None:
+        if len(argv) != 1:
+            return None, None
+    else:
+        if len(argv) != 2 or argv[1].startswith("-"):
+            return None, None
+        setattr(args, positional, argv[1])
+    return args, handler_name
+
+@functools.cache
+def _build_parser():
+    import argparse
     parser = argparse.ArgumentParser(
         description=colored("A C/C++ package manager", CYAN),
     )
@@ -54,28 +86,28 @@ def main():
         "project_name",
         help="Name of the project directory to create"
     )
-    new_parser.set_defaults(func=run_new)
+    new_parser.set_defaults(func=_lazy("run_new"))
 
     build_parser = subparsers.add_parser(
         "build",
         aliases=["b"],
         help="Compile the current package"
     )
-    build_parser.set_defaults(func=run_build)
+    build_parser.set_defaults(func=_lazy("run_build"))
 
     run_parser = subparsers.add_parser(
         "run",
         aliases=["r"],
         help="Run a binary or example of the local package (make then run)"
     )
-    run_parser.set_defaults(func=run_run)
+    run_parser.set_defaults(func=_lazy("run_run"))
 
     install_parser = subparsers.add_parser(
         "install",
         aliases=["i"],
         help="Install dependencies listed in Relay.toml via vcpkg"
     )
-    install_parser.set_defaults(func=run_install_command)
+    install_parser.set_defaults(func=_lazy("run_install_command"))
 
     add_parser = subparsers.add_parser(
         "add",
@@ -85,7 +117,7 @@ def main():
         "dependency_name",
         help="Name of the dependency to add"
     )
-    add_parser.set_defaults(func=add_dependency_to_manifest)
+    add_parser.set_defaults(func=_lazy("add_dependency_to_manifest"))
 
     remove_parser = subparsers.add_parser(
         "remove",
@@ -96,22 +128,38 @@ def main():
         "dependency_name",
         help="Name of the dependency to remove"
     )
-    remove_parser.set_defaults(func=run_remove_dependency)
+    remove_parser.set_defaults(func=_lazy("run_remove_dependency"))
 
     list_parser = subparsers.add_parser(
         "list",
         aliases=["l"],
         help="List project dependencies"
     )
-    list_parser.set_defaults(func=run_list_dependencies)
+    list_parser.set_defaults(func=_lazy("run_list_dependencies"))
 
     clean_parser = subparsers.add_parser(
         "clean",
         help="Remove build artifacts and cached files"
     )
-    clean_parser.set_defaults(func=run_clean)
+    clean_parser.set_defaults(func=_lazy("run_clean"))
+    return parser
+
+def main():
+    # `relay --version` alone needs neither argparse nor the subparsers.
+    if sys.argv[1:] in (["--version"], ["-V"]):
+        print(f"relay {colored(RELAY_VERSION, BOLD)}")
+        return
+
+    args, handler_name = _fast_path_args(sys.argv[1:])
+    if args is not None:
+        _lazy(handler_name)(args)
+        return
 
+    parser = _build_parser()
     args = parser.parse_args()
+    if args.verbose:
+        import logging
+        logging.basicConfig(stream=sys.stdout, format=colored("%(message)s", CYAN), level=logging.DEBUG)
     if hasattr(args, 'func'):
         args.func(args)
     else:
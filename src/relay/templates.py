@@ -1,3 +1,10 @@
+import re
+
+if __package__:
+    from relay.constants import MANIFEST_FILE
+else:
+    from constants import MANIFEST_FILE
+
 MAIN_C_TEMPLATE = """\
 #include "{project_name}.h"
 
@@ -59,4 +66,26 @@ TabWidth: 2
 GITIGNORE = """\
 build/
 vcpkg_installed/
-"""
\ No newline at end of file
+"""
+
+def _compile(template, field):
+    parts = [part.replace("{{", "{").replace("}}", "}") for part in template.split(f"{{{field}}}")]
+    return lambda value: value.join(parts)
+
+render_main_c = _compile(MAIN_C_TEMPLATE, "project_name")
+render_main_h = _compile(MAIN_H_TEMPLATE, "include_guard")
+render_cmakelists = _compile(CMAKELISTS_TEMPLATE, "project_name")
+render_relay_toml = _compile(RELAY_TOML_TEMPLATE, "project_name")
+
+_GUARD_RE = re.compile(r"[^A-Z0-9_]")
+
+def render_new_project(project_name):
+    include_guard = f"{_GUARD_RE.sub('_', project_name.upper())}_H"
+    return [
+        ("src/main.c", render_main_c(project_name)),
+        (f"include/{project_name}.h", render_main_h(include_guard)),
+        ("CmakeLists.txt", render_cmakelists(project_name)),
+        (".clang-format", CLANG_FORMAT_TEMPLATE),
+        (".gitignore", GITIGNORE),
+        (MANIFEST_FILE, render_relay_toml(project_name)),
+    ]